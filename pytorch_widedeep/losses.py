@@ -308,7 +308,7 @@ class FocalLoss(nn.Module):
         """
         input_prob = torch.sigmoid(input)
         if input.size(1) == 1:
-            input_prob = torch.cat([1 - input_prob, input_prob], axis=1)  # type: ignore
+            input_prob = torch.cat([1 - input_prob, input_prob], dim=1)
             num_class = 2
         else:
             num_class = input_prob.size(1)
@@ -20,4 +20,4 @@ from pytorch_widedeep.models.tabular import (
     TabResnetDecoder,
     ContextAttentionMLP,
 )
-from pytorch_widedeep.models.wide_deep import WideDeep
+from pytorch_widedeep.models.wide_deep import WDInput, WideDeep
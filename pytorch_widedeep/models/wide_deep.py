@@ -2,8 +2,18 @@ import warnings
 
 import torch
 from torch import nn
-
-from pytorch_widedeep.wdtypes import Dict, List, Tuple, Union, Tensor, Optional
+from torch.nn.parallel import DistributedDataParallel
+
+from pytorch_widedeep.wdtypes import (
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Tensor,
+    Callable,
+    Optional,
+    NamedTuple,
+)
 from pytorch_widedeep.models.fds_layer import FDSLayer
 from pytorch_widedeep.models._get_activation_fn import get_activation_fn
 from pytorch_widedeep.models.tabular.mlp._layers import MLP
@@ -18,6 +28,43 @@ warnings.filterwarnings("default", category=UserWarning)
 WDModel = Union[nn.Module, BaseWDModelComponent]
 
 
+class WDInput(NamedTuple):
+    r"""Container with the inputs to the `WideDeep` model.
+
+    `WideDeep` accepts either a dictionary keyed by `'wide'`,
+    `'deeptabular'`, `'deeptext'` and `'deepimage'` or this container.
+    Dictionaries are converted to `WDInput` when entering the forward pass.
+    Having a fixed set of fields (unlike the keys of a dictionary) leads to
+    a single, stable graph when the model is compiled.
+    """
+
+    wide: Optional[Tensor] = None
+    deeptabular: Optional[Tensor] = None
+    deeptext: Optional[Tensor] = None
+    deepimage: Optional[Tensor] = None
+
+
+# the final step of the forward pass. These are module-level functions
+# taking the model as an argument because storing a bound method of the
+# model on the model itself would create a reference cycle, and the model
+# would not be freed until the garbage collector runs
+def _identity(model: "WideDeep", X: Tensor) -> Tensor:
+    return X
+
+
+def _enforce_positive(model: "WideDeep", X: Tensor) -> Tensor:
+    # calling the module runs its hooks and picks up any reassignment
+    return model.enf_pos(X)
+
+
+def _forward_impl(
+    model: "WideDeep", X: WDInput
+) -> Union[Tensor, Tuple[Tensor, Tensor]]:
+    # compiled in place of the bound 'model._forward_impl' for the same
+    # reason (see above)
+    return model._forward_impl(X)
+
+
 class WideDeep(nn.Module):
     r"""Main collector class that combines all `wide`, `deeptabular`
     `deeptext` and `deepimage` models.
@@ -92,6 +139,37 @@ class WideDeep(nn.Module):
         applied before the final prediction layer. Only available for
         regression problems.
         See [Delving into Deep Imbalanced Regression](https://arxiv.org/abs/2102.09554) for details.
+    channels_last: bool, default = False
+        Boolean indicating if the `deepimage` component and the image inputs
+        will use the channels last (NHWC) memory format, which is faster
+        for convolutional backbones (e.g. the `Vision` component) on modern
+        GPUs. Only 4D parameters and inputs are affected.
+        <br/>
+        :information_source: **NOTE**: custom `deepimage` components must
+        support non-contiguous inputs (e.g. use `reshape` rather than
+        `view`)
+    compile: bool, default = False
+        Boolean indicating if the forward pass (excluding the FDS path) will
+        be compiled with `torch.compile` (`mode="reduce-overhead"`). This
+        allows the `wide`, deep and `deephead` forward passes to be traced
+        into a single graph and fused. Requires `torch>=2.0`.
+        <br/>
+        :information_source: **NOTE**: the first call(s) to the compiled
+        forward pass will trigger the compilation, which can take over a
+        minute. If the model is going to be used for inference, call
+        `model.eval()` before the first forward pass so that the
+        inference-only fusion passes are applied
+    script_head: bool, default = False
+        Boolean indicating if the `deephead` (built via `head_hidden_dims`
+        or passed as a custom `deephead`) will be compiled with
+        `torch.jit.script`. This is an alternative to `compile` when
+        `torch.compile` is not available or provides no benefit (e.g. CPU
+        only deployments). Only the `deephead` is scripted.
+        <br/>
+        :information_source: **NOTE**: scripted modules cannot be pickled.
+        Therefore, when `script_head = True` the model must be saved via
+        its `state_dict` (i.e. `save_state_dict = True` in the `Trainer`'s
+        `save` method, which otherwise raises a `ValueError`)
 
     Other Parameters
     ----------------
@@ -148,10 +226,20 @@ class WideDeep(nn.Module):
         enforce_positive_activation: str = "softplus",
         pred_dim: int = 1,
         with_fds: bool = False,
+        channels_last: bool = False,
+        compile: bool = False,
+        script_head: bool = False,
         **fds_config,
     ):
         super(WideDeep, self).__init__()
 
+        # size of the concatenated output of the deep components (i.e. the
+        # input to the deephead) and the position of each component within
+        # it. Computed once and used across the class
+        self._deep_total_dim, self._deepside_slices = self._get_deepside_slices(
+            deeptabular, deeptext, deepimage
+        )
+
         self._check_inputs(
             wide,
             deeptabular,
@@ -161,12 +249,9 @@ class WideDeep(nn.Module):
             head_hidden_dims,
             pred_dim,
             with_fds,
+            self._deep_total_dim,
         )
 
-        # this attribute will be eventually over-written by the Trainer's
-        # device. Acts here as a 'placeholder'.
-        self.wd_device: str = None
-
         # required as attribute just in case we pass a deephead
         self.pred_dim = pred_dim
 
@@ -176,11 +261,9 @@ class WideDeep(nn.Module):
         # The main 5 components of the wide and deep assemble: wide,
         # deeptabular, deeptext, deepimage and deephead
         self.with_deephead = deephead is not None or head_hidden_dims is not None
+        self.deephead: Optional[Union[nn.Module, torch.jit.ScriptModule]]
         if deephead is None and head_hidden_dims is not None:
             self.deephead = self._build_deephead(
-                deeptabular,
-                deeptext,
-                deepimage,
                 head_hidden_dims,
                 head_activation,
                 head_dropout,
@@ -196,42 +279,338 @@ class WideDeep(nn.Module):
             # for consistency with other components we default to None
             self.deephead = None
 
+        if script_head and self.deephead is not None:
+            self.deephead = torch.jit.script(self.deephead)
+
         self.wide = wide
         self.deeptabular, self.deeptext, self.deepimage = self._set_model_components(
             deeptabular, deeptext, deepimage, self.with_deephead
         )
 
+        self.channels_last = channels_last and self.deepimage is not None
+        if self.channels_last:
+            # this only affects 4D parameters. The image inputs are converted
+            # accordingly in the forward pass
+            self.deepimage = self.deepimage.to(memory_format=torch.channels_last)
+
+        # the deep components run in the forward pass are fixed at
+        # construction time, so there is no need to check which ones are
+        # present at every step. TabNet is treated separately since it also
+        # returns the sparse regularization factor
+        self._deep_components: List[str] = self._get_deep_components()
+
         if self.with_fds:
             self.fds_layer = FDSLayer(feature_dim=self.deeptabular.output_dim, **fds_config)  # type: ignore[arg-type]
 
+        # the final activation is selected here rather than checking
+        # 'enforce_positive' at every forward pass
         if self.enforce_positive:
             self.enf_pos = get_activation_fn(enforce_positive_activation)
+            self._tail: Callable = _enforce_positive
+        else:
+            self._tail = _identity
+
+        self.with_compile = compile
+        self._compiled_forward = self._compile_forward() if compile else None
+
+        # set to False if the prediction layers are quantized
+        self._fuse_pred_layers = True
+
+        # created on the first call to 'prefetch' on GPU
+        self._prefetch_stream: Optional[torch.cuda.Stream] = None
 
     def forward(
         self,
-        X: Dict[str, Tensor],
+        X: Union[Dict[str, Tensor], WDInput],
         y: Optional[Tensor] = None,
         epoch: Optional[int] = None,
     ) -> Union[Tensor, Tuple[Tensor, Tensor]]:
+        if isinstance(X, dict):
+            X = WDInput(
+                X.get("wide"),
+                X.get("deeptabular"),
+                X.get("deeptext"),
+                X.get("deepimage"),
+            )
+
+        if self.channels_last and X.deepimage.dim() == 4:
+            X = X._replace(
+                deepimage=X.deepimage.contiguous(memory_format=torch.channels_last)
+            )
+
         if self.with_fds:
             return self._forward_deep_with_fds(X, y, epoch)
 
+        if self._compiled_forward is not None:
+            return self._compiled_forward(self, X)
+        else:
+            return self._forward_impl(X)
+
+    def forward_amp(
+        self,
+        X: Union[Dict[str, Tensor], WDInput],
+        y: Optional[Tensor] = None,
+        epoch: Optional[int] = None,
+        dtype: torch.dtype = torch.bfloat16,
+    ) -> Union[Tensor, Tuple[Tensor, Tensor]]:
+        r"""Forward pass with automatic mixed precision (`torch.autocast`).
+
+        The matmul-heavy layers of the model components run in `dtype`
+        (e.g. `bfloat16` on modern GPUs), which roughly halves the memory
+        traffic and uses the tensor cores. Operations that are numerically
+        sensitive (e.g. reductions or the FDS statistics) remain in
+        `float32`, as handled by autocast.
+
+        :information_source: **NOTE**: when training with `float16` pair
+         this method with a `torch.cuda.amp.GradScaler` to avoid gradient
+         underflow. This is not needed with `bfloat16`
+
+        Parameters
+        ----------
+        X: Dict or WDInput
+            the model inputs, exactly as in the `forward` method
+        y: Tensor, Optional, default = None
+            target values. Only used with FDS, as in the `forward` method
+        epoch: int, Optional, default = None
+            current epoch. Only used with FDS, as in the `forward` method
+        dtype: torch.dtype, default = torch.bfloat16
+            lower precision data type, `torch.bfloat16` or `torch.float16`
+
+        Returns
+        -------
+        Tensor or Tuple:
+            the output of the `forward` method
+        """
+        device_type = next(self.parameters()).device.type
+        with torch.autocast(device_type=device_type, dtype=dtype):
+            return self.forward(X, y, epoch)
+
+    def prefetch(
+        self,
+        X: Dict[str, Tensor],
+        stream: Optional[torch.cuda.Stream] = None,
+    ) -> Dict[str, Tensor]:
+        r"""Copies the input tensors to the device where the model is.
+
+        On GPU the copies are issued asynchronously on a dedicated CUDA
+        stream, so that the host to device transfer of a batch can overlap
+        with the computation that is already queued. For the copies to be
+        truly asynchronous the input tensors must be in pinned memory, i.e.
+        use `pin_memory=True` in the `DataLoader` (which can be passed to
+        the `Trainer`'s `fit` method).
+
+        :information_source: **NOTE**: this method is not used by the
+         `Trainer`. In a custom training loop, call it for the next batch
+         once the computation for the current one has been queued (e.g.
+         right after `optimizer.step()`) so that both overlap
+
+        Parameters
+        ----------
+        X: Dict
+            Dictionary where the keys are the model components (e.g.
+            `'deeptabular'`) and the values the corresponding input tensors
+        stream: torch.cuda.Stream, Optional, default = None
+            Stream used for the copies. If `None` a stream owned by the
+            model is used
+
+        Returns
+        -------
+        Dict:
+            Dictionary with the input tensors on the model's device
+        """
+        device = next(self.parameters()).device
+        if device.type != "cuda":
+            return {k: v.to(device) for k, v in X.items()}
+
+        if stream is None:
+            if self._prefetch_stream is None:
+                self._prefetch_stream = torch.cuda.Stream(device)
+            stream = self._prefetch_stream
+
+        with torch.cuda.stream(stream):
+            X_device = {k: v.to(device, non_blocking=True) for k, v in X.items()}
+
+        # the computation must wait for the copies, and the memory of the
+        # copied tensors must not be reused while it is still in use
+        current_stream = torch.cuda.current_stream(device)
+        current_stream.wait_stream(stream)
+        for v in X_device.values():
+            v.record_stream(current_stream)
+
+        return X_device
+
+    def quantize_for_inference(self, dtype: torch.dtype = torch.qint8) -> "WideDeep":
+        r"""Applies dynamic quantization to all the `nn.Linear` layers in the
+        model (in place). The weights are stored as `int8` and the
+        activations are quantized on the fly, which reduces the memory
+        footprint and speeds up inference on CPU.
+
+        :information_source: **NOTE**: this method is meant to be used
+         once the model is trained. Call `model.eval()` before
+         quantizing the model. The quantized model can only be used for
+         inference and on CPU
+
+        :information_source: **NOTE**: models with a `TabNet`
+         `deeptabular` component are not quantized, since the sparse
+         feature selection of `TabNet` is sensitive to quantization errors
+
+        Parameters
+        ----------
+        dtype: torch.dtype, default = torch.qint8
+            quantized data type of the weights. `torch.qint8` or
+            `torch.float16`
+
+        Returns
+        -------
+        WideDeep:
+            the quantized model
+        """
+        if self.is_tabnet:
+            warnings.warn(
+                "Models with a 'TabNet' 'deeptabular' component are not quantized",
+                UserWarning,
+            )
+            return self
+
+        torch.ao.quantization.quantize_dynamic(
+            self, {nn.Linear}, dtype=dtype, inplace=True
+        )
+        self._fuse_pred_layers = False
+
+        return self
+
+    def to_ddp(
+        self,
+        device_id: int,
+        bucket_cap_mb: Optional[float] = None,
+        find_unused_parameters: bool = False,
+    ) -> DistributedDataParallel:
+        r"""Moves the model to the GPU `device_id` and wraps it with
+        `DistributedDataParallel` (DDP) for multi-GPU training.
+
+        The gradients are allreduced in buckets. The default bucket size
+        is set according to the size of the model components (`wide`,
+        `deeptabular`, etc.) so that the allreduce of the gradients of
+        one component can overlap with the backward pass of the others. In
+        addition, the gradients are views of the allreduce buckets
+        (`gradient_as_bucket_view=True`), which saves a copy of the
+        gradients and the corresponding memory.
+
+        :information_source: **NOTE**: the process group must be
+         initialized (i.e. `torch.distributed.init_process_group`) before
+         calling this method. Note also that the returned model is meant to
+         be used in custom training loops, not within the `Trainer`
+
+        Parameters
+        ----------
+        device_id: int
+            index of the GPU used by the current process
+        bucket_cap_mb: float, Optional, default = None
+            size in MB of the allreduce buckets. If `None` it is set to
+            the size of the smallest component, with a minimum of 25MB
+            (the DDP default)
+        find_unused_parameters: bool, default = False
+            Boolean indicating if DDP must look for parameters that do not
+            receive gradients. All `WideDeep` parameters are used in the
+            forward pass, so this is only needed if custom components
+            leave some of their parameters unused. It comes at a
+            performance cost
+
+        Returns
+        -------
+        DistributedDataParallel:
+            the wrapped model
+        """
+        if bucket_cap_mb is None:
+            bucket_cap_mb = self._default_bucket_cap_mb()
+
+        self.to(device_id)
+
+        return DistributedDataParallel(
+            self,
+            device_ids=[device_id],
+            output_device=device_id,
+            bucket_cap_mb=bucket_cap_mb,
+            find_unused_parameters=find_unused_parameters,
+            gradient_as_bucket_view=True,
+        )
+
+    def _default_bucket_cap_mb(self) -> float:
+        # size in MB of the smallest component, with a minimum of 25MB.
+        # Activation functions (e.g. 'enf_pos') have no parameters
+        components_size_mb = [
+            sum(p.numel() * p.element_size() for p in c.parameters()) / 2**20
+            for c in self.children()
+        ]
+        return max(25, min([s for s in components_size_mb if s > 0], default=25))
+
+    def __getstate__(self):
+        # compiled callables and cuda streams cannot be pickled (or
+        # deep-copied). They are re-built when needed after loading
+        state = self.__dict__.copy()
+        state["_compiled_forward"] = None
+        state["_prefetch_stream"] = None
+        return state
+
+    def __setstate__(self, state):
+        super(WideDeep, self).__setstate__(state)
+        if "_deep_components" not in state:
+            self._set_missing_attributes()
+        if getattr(self, "with_compile", False):
+            self._compiled_forward = self._compile_forward()
+
+    def _set_missing_attributes(self):
+        # models pickled with previous versions of the library lack the
+        # attributes that are now computed at construction time. These are
+        # re-built here from the model components so that such models can
+        # still be loaded
+        components = []
+        for component in [self.deeptabular, self.deeptext, self.deepimage]:
+            # without a deephead (or with FDS) the components are wrapped in
+            # a Sequential together with their prediction layer
+            if component is not None and not hasattr(component, "output_dim"):
+                component = component[0]
+            components.append(component)
+        self._deep_total_dim, self._deepside_slices = self._get_deepside_slices(
+            *components
+        )
+        self._deep_components = self._get_deep_components()
+        self._tail = _enforce_positive if self.enforce_positive else _identity
+        self._fuse_pred_layers = True
+        self._prefetch_stream = None
+        self.channels_last = False
+        self.with_compile = False
+        self._compiled_forward = None
+
+    def _get_deep_components(self) -> List[str]:
+        return [
+            name
+            for name in ["deeptabular", "deeptext", "deepimage"]
+            if getattr(self, name) is not None
+            and not (name == "deeptabular" and self.is_tabnet)
+        ]
+
+    def _compile_forward(self) -> Callable:
+        if not hasattr(torch, "compile"):
+            raise ValueError(
+                "'compile' is set to True but 'torch.compile' is not available. "
+                "Please, upgrade to torch>=2.0"
+            )
+        return torch.compile(
+            _forward_impl, mode="reduce-overhead", fullgraph=False, dynamic=False
+        )
+
+    def _forward_impl(self, X: WDInput) -> Union[Tensor, Tuple[Tensor, Tensor]]:
         wide_out = self._forward_wide(X)
         if self.with_deephead:
             deep = self._forward_deephead(X, wide_out)
         else:
             deep = self._forward_deep(X, wide_out)
 
-        if self.enforce_positive:
-            return self.enf_pos(deep)
-        else:
-            return deep
+        return self._tail(self, deep)
 
     def _build_deephead(
         self,
-        deeptabular: Optional[BaseWDModelComponent],
-        deeptext: Optional[BaseWDModelComponent],
-        deepimage: Optional[BaseWDModelComponent],
         head_hidden_dims: Optional[List[int]],
         head_activation: str,
         head_dropout: float,
@@ -239,15 +618,7 @@ class WideDeep(nn.Module):
         head_batchnorm_last: bool,
         head_linear_first: bool,
     ) -> nn.Sequential:
-        deep_dim = 0
-        if deeptabular is not None:
-            deep_dim += deeptabular.output_dim
-        if deeptext is not None:
-            deep_dim += deeptext.output_dim
-        if deepimage is not None:
-            deep_dim += deepimage.output_dim
-
-        head_hidden_dims = [deep_dim] + head_hidden_dims
+        head_hidden_dims = [self._deep_total_dim] + head_hidden_dims
         deephead = nn.Sequential(
             MLP(
                 head_hidden_dims,
@@ -262,6 +633,22 @@ class WideDeep(nn.Module):
 
         return deephead
 
+    @staticmethod
+    def _get_deepside_slices(
+        deeptabular: Optional[BaseWDModelComponent],
+        deeptext: Optional[BaseWDModelComponent],
+        deepimage: Optional[BaseWDModelComponent],
+    ) -> Tuple[int, List[Tuple[int, int]]]:
+        # components without an 'output_dim' are reported in '_check_inputs'
+        deep_total_dim = 0
+        deepside_slices: List[Tuple[int, int]] = []
+        for component in (deeptabular, deeptext, deepimage):
+            if component is not None:
+                output_dim = getattr(component, "output_dim", 0)
+                deepside_slices.append((deep_total_dim, deep_total_dim + output_dim))
+                deep_total_dim += output_dim
+        return deep_total_dim, deepside_slices
+
     def _set_model_components(
         self,
         deeptabular: Optional[BaseWDModelComponent],
@@ -320,71 +707,133 @@ class WideDeep(nn.Module):
 
         return deeptabular_, deeptext_, deepimage_
 
-    def _forward_wide(self, X: Dict[str, Tensor]) -> Tensor:
-        if self.wide is not None:
-            out = self.wide(X["wide"])
+    def _forward_wide(self, X: WDInput) -> Tensor:
+        # submodules are accessed through nn.Module.__getattr__, which is
+        # slower than a local variable lookup. Attributes used more than
+        # once per forward pass are bound to locals (here and below)
+        wide = self.wide
+        if wide is not None:
+            out = wide(X.wide)
         else:
-            batch_size = X[list(X.keys())[0]].size(0)
-            out = torch.zeros(batch_size, self.pred_dim).to(self.wd_device)
+            # allocated directly on the device of the inputs, avoiding a
+            # host to device copy every forward pass
+            X_any = next(X_inp for X_inp in X if X_inp is not None)
+            out = X_any.new_zeros((X_any.size(0), self.pred_dim), dtype=torch.float)
 
         return out
 
     def _forward_deephead(
-        self, X: Dict[str, Tensor], wide_out: Tensor
+        self, X: WDInput, wide_out: Tensor
     ) -> Union[Tensor, Tuple[Tensor, Tensor]]:
-        if self.deeptabular is not None:
-            if self.is_tabnet:
-                tab_out = self.deeptabular(X["deeptabular"])
-                deepside, M_loss = tab_out[0], tab_out[1]
-            else:
-                deepside = self.deeptabular(X["deeptabular"])
-        else:
-            deepside = torch.FloatTensor().to(self.wd_device)
-        if self.deeptext is not None:
-            deepside = torch.cat([deepside, self.deeptext(X["deeptext"])], axis=1)  # type: ignore[call-overload]
-        if self.deepimage is not None:
-            deepside = torch.cat([deepside, self.deepimage(X["deepimage"])], axis=1)  # type: ignore[call-overload]
+        is_tabnet = self.is_tabnet
 
-        deepside_out = self.deephead(deepside)
+        deep_outs: List[Tensor] = []
+        if is_tabnet:
+            deep_tab, M_loss = self.deeptabular(X.deeptabular)
+            deep_outs.append(deep_tab)
+        for name in self._deep_components:
+            deep_outs.append(getattr(self, name)(getattr(X, name)))
 
-        if self.is_tabnet:
-            res: Union[Tensor, Tuple[Tensor, Tensor]] = (
-                wide_out.add_(deepside_out),
-                M_loss,
-            )
+        if len(deep_outs) == 1:
+            deepside = deep_outs[0]
+        else:
+            # the input to the deephead is allocated once and filled in,
+            # rather than growing it via consecutive concatenations
+            first_out = deep_outs[0]
+            deepside = first_out.new_empty((first_out.size(0), self._deep_total_dim))
+            for deep_out, (start, end) in zip(deep_outs, self._deepside_slices):
+                deepside[:, start:end].copy_(deep_out)
+
+        # out-of-place additions (here and in '_forward_deep') so that no
+        # input or output tensor is mutated during the forward pass (only the
+        # freshly allocated 'deepside' buffer above is filled in place). This
+        # allows the compiled forward to be captured in CUDA graphs
+        # without a wide component 'wide_out' is all zeros (and float32
+        # regardless of the dtype of the model), so there is nothing to add
+        deephead_out = self.deephead(deepside)
+        out = deephead_out if self.wide is None else wide_out + deephead_out
+
+        if is_tabnet:
+            res: Union[Tensor, Tuple[Tensor, Tensor]] = (out, M_loss)
         else:
-            res = wide_out.add_(deepside_out)
+            res = out
 
         return res
 
     def _forward_deep(
-        self, X: Dict[str, Tensor], wide_out: Tensor
+        self, X: WDInput, wide_out: Tensor
     ) -> Union[Tensor, Tuple[Tensor, Tensor]]:
-        if self.deeptabular is not None:
-            if self.is_tabnet:
-                tab_out, M_loss = self.deeptabular(X["deeptabular"])
-                wide_out.add_(tab_out)
-            else:
-                wide_out.add_(self.deeptabular(X["deeptabular"]))
-        if self.deeptext is not None:
-            wide_out.add_(self.deeptext(X["deeptext"]))
-        if self.deepimage is not None:
-            wide_out.add_(self.deepimage(X["deepimage"]))
-
-        if self.is_tabnet:
-            res: Union[Tensor, Tuple[Tensor, Tensor]] = (wide_out, M_loss)
+        # Each deep component is a nn.Sequential(model, pred_layer). Instead
+        # of running the three prediction layers separately, the activations
+        # of the deep components are concatenated and the prediction layers
+        # are applied as a single matmul using the concatenated weights.
+        # The parameters remain in the individual components so that these
+        # can still be fine-tuned (or loaded from a state_dict) individually.
+        # Note that the concatenations run at every forward pass, so in eager
+        # mode this is roughly on par with the individual layers. The gain
+        # comes with 'compile = True', where the whole head is one kernel
+        is_tabnet = self.is_tabnet
+
+        deep_feats: List[Tensor] = []
+        pred_layers: List[nn.Linear] = []
+        if is_tabnet:
+            deep_tab, M_loss = self.deeptabular[0](X.deeptabular)  # type: ignore[index]
+            deep_feats.append(deep_tab)
+            pred_layers.append(self.deeptabular[1].pred_layer)  # type: ignore[index]
+        for name in self._deep_components:
+            component = getattr(self, name)
+            deep_feats.append(component[0](getattr(X, name)))
+            pred_layers.append(component[1])
+
+        if not deep_feats:
+            out = wide_out
+        elif self._fuse_pred_layers:
+            out = self._fused_pred_layer(wide_out, deep_feats, pred_layers)
         else:
-            res = wide_out
+            # quantized prediction layers do not expose their weights as
+            # tensors that can be concatenated
+            out = wide_out
+            for deep_feat, pred_layer in zip(deep_feats, pred_layers):
+                out = out + pred_layer(deep_feat)
+
+        if is_tabnet:
+            res: Union[Tensor, Tuple[Tensor, Tensor]] = (out, M_loss)
+        else:
+            res = out
 
         return res
 
+    @staticmethod
+    def _fused_pred_layer(
+        wide_out: Tensor, deep_feats: List[Tensor], pred_layers: List[nn.Linear]
+    ) -> Tensor:
+        if len(deep_feats) == 1:
+            deep_feat, weight = deep_feats[0], pred_layers[0].weight
+        else:
+            deep_feat = torch.cat(deep_feats, dim=1)
+            weight = torch.cat([pl.weight for pl in pred_layers], dim=1)
+
+        bias: Optional[Tensor] = None
+        for pl in pred_layers:
+            if pl.bias is not None:
+                bias = pl.bias if bias is None else bias + pl.bias
+
+        # the addition of the wide output and the biases is fused with the
+        # matmul through the input of addmm, which requires a common dtype
+        # (e.g. the float32 zeros used when there is no wide component and
+        # a model cast via '.double()')
+        wide_out = wide_out.to(deep_feat.dtype)
+        return torch.addmm(
+            wide_out if bias is None else wide_out + bias, deep_feat, weight.t()
+        )
+
     def _forward_deep_with_fds(
         self,
-        X: Dict[str, Tensor],
+        X: WDInput,
         y: Optional[Tensor] = None,
         epoch: Optional[int] = None,
     ) -> Union[Tensor, Tuple[Tensor, Tensor]]:
-        res = self.fds_layer(self.deeptabular(X["deeptabular"]), y, epoch)
+        res = self.fds_layer(self.deeptabular(X.deeptabular), y, epoch)
         if self.enforce_positive:
             if isinstance(res, Tuple):  # type: ignore[arg-type]
                 out: Union[Tensor, Tuple[Tensor, Tensor]] = (
@@ -407,6 +856,7 @@ class WideDeep(nn.Module):
         head_hidden_dims,
         pred_dim,
         with_fds,
+        deep_total_dim,
     ):
         if wide is not None:
             assert wide.wide_linear.weight.size(1) == pred_dim, (
@@ -467,17 +917,10 @@ class WideDeep(nn.Module):
                     "'output_dim' attribute or property. "
                 )
             deephead_inp_feat = next(deephead.parameters()).size(1)
-            output_dim = 0
-            if deeptabular is not None:
-                output_dim += deeptabular.output_dim
-            if deeptext is not None:
-                output_dim += deeptext.output_dim
-            if deepimage is not None:
-                output_dim += deepimage.output_dim
-            assert deephead_inp_feat == output_dim, (
+            assert deephead_inp_feat == deep_total_dim, (
                 "if a custom 'deephead' is used its input features ({}) must be equal to "
                 "the output features of the deep component ({})".format(
-                    deephead_inp_feat, output_dim
+                    deephead_inp_feat, deep_total_dim
                 )
             )
 
@@ -68,7 +68,6 @@ class BaseTrainer(ABC):
             self.lambda_sparse = kwargs.get("lambda_sparse", 1e-3)
             self.reducing_matrix = create_explain_matrix(self.model)
         self.model.to(self.device)
-        self.model.wd_device = self.device
 
         self.objective = objective
         self.method = _ObjectiveToMethod.get(objective)
@@ -840,6 +840,15 @@ class Trainer(BaseTrainer):
             filename where the model weights will be store
         """
 
+        if not save_state_dict and isinstance(
+            self.model.deephead, torch.jit.ScriptModule
+        ):
+            raise ValueError(
+                "Models with a scripted 'deephead' (i.e. 'script_head = True') "
+                "cannot be pickled. Please, save the model's state dict by "
+                "setting 'save_state_dict = True'"
+            )
+
         save_dir = Path(path)
         history_dir = save_dir / "history"
         history_dir.mkdir(exist_ok=True, parents=True)
@@ -14,6 +14,7 @@ from typing import (
     Optional,
     Generator,
     Collection,
+    NamedTuple,
 )
 from pathlib import PosixPath
 
@@ -1,5 +1,8 @@
+import pickle
+import weakref
 from copy import deepcopy
 
+import torch
 import pytest
 from torch import nn
 
@@ -8,9 +11,11 @@ from pytorch_widedeep.models import (
     TabMlp,
     TabNet,
     Vision,
+    WDInput,
     BasicRNN,
     WideDeep,
 )
+from pytorch_widedeep.training import Trainer
 
 embed_input = [(u, i, j) for u, i, j in zip(["a", "b", "c"][:4], [4] * 3, [8] * 3)]
 column_idx = {k: v for v, k in enumerate(["a", "b", "c"])}
@@ -65,3 +70,304 @@ def test_no_deephead_and_head_layers_dim():
 def test_tabnet_warning():
     with pytest.warns(UserWarning):
         model = WideDeep(wide=wide, deeptabular=tabnet)  # noqa: F841
+
+
+###############################################################################
+# test the fused prediction layer is equivalent to the individual ones
+###############################################################################
+
+
+def test_fused_pred_layer():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    X_text = torch.randint(1, 100, (5, 10))
+    model = WideDeep(deeptabular=deepcopy(tabmlp), deeptext=deepcopy(deeptext))
+    model.eval()
+    with torch.no_grad():
+        out = model({"deeptabular": X_tab, "deeptext": X_text})
+        expected = model.deeptabular(X_tab) + model.deeptext(X_text)
+    assert torch.allclose(out, expected, atol=1e-6)
+
+
+###############################################################################
+# test models whose parameters are not float32
+###############################################################################
+
+
+class LinearComponent(nn.Module):
+    def __init__(self):
+        super(LinearComponent, self).__init__()
+        self.linear = nn.Linear(3, 4)
+        self.output_dim = 4
+
+    def forward(self, X):
+        return self.linear(X)
+
+
+@pytest.mark.parametrize("head_hidden_dims", [None, [8, 4]])
+@pytest.mark.parametrize("dtype", [torch.float64, torch.float16, torch.bfloat16])
+def test_non_float32_model(head_hidden_dims, dtype):
+    X_tab = torch.rand(5, 3).to(dtype)
+    model = WideDeep(deeptabular=LinearComponent(), head_hidden_dims=head_hidden_dims)
+    model = model.to(dtype)
+    model.eval()
+    with torch.no_grad():
+        out = model({"deeptabular": X_tab})
+    assert out.dtype == dtype and out.size() == (5, 1)
+
+
+###############################################################################
+# test the deephead output is deterministic (no layers built in the forward)
+###############################################################################
+
+
+def test_deephead_forward_is_deterministic():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    X_text = torch.randint(1, 100, (5, 10))
+    model = WideDeep(
+        deeptabular=deepcopy(tabmlp),
+        deeptext=deepcopy(deeptext),
+        head_hidden_dims=[8, 4],
+        pred_dim=2,
+    )
+    model.eval()
+    with torch.no_grad():
+        out1 = model({"deeptabular": X_tab, "deeptext": X_text})
+        out2 = model({"deeptabular": X_tab, "deeptext": X_text})
+    assert out1.size() == (5, 2) and torch.equal(out1, out2)
+
+
+###############################################################################
+# test the hooks of the enforce positive activation are run
+###############################################################################
+
+
+def test_enforce_positive_hooks():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    model = WideDeep(deeptabular=deepcopy(tabmlp), enforce_positive=True)
+    outputs = []
+    model.enf_pos.register_forward_hook(lambda m, inp, out: outputs.append(out))
+    out = model({"deeptabular": X_tab})
+    assert len(outputs) == 1 and torch.equal(outputs[0], out)
+    assert (out > 0).all()
+
+
+###############################################################################
+# test the model is freed without the garbage collector (no reference cycles)
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "enforce_positive, compile", [(True, False), (False, False), (False, True)]
+)
+def test_no_reference_cycles(enforce_positive, compile):
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    model = WideDeep(
+        deeptabular=deepcopy(tabmlp),
+        enforce_positive=enforce_positive,
+        compile=compile,
+    )
+    model({"deeptabular": X_tab})
+    model_ref = weakref.ref(model)
+    del model
+    assert model_ref() is None
+
+
+###############################################################################
+# test the deephead can be scripted
+###############################################################################
+
+
+def test_script_head():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    model = WideDeep(
+        deeptabular=deepcopy(tabmlp), head_hidden_dims=[8, 4], script_head=True
+    )
+    model.eval()
+    with torch.no_grad():
+        out = model({"deeptabular": X_tab})
+    assert isinstance(model.deephead, torch.jit.ScriptModule)
+    assert out.size() == (5, 1)
+
+
+def test_script_head_save(tmp_path):
+    model = WideDeep(
+        deeptabular=deepcopy(tabmlp), head_hidden_dims=[8, 4], script_head=True
+    )
+    trainer = Trainer(model, objective="binary", verbose=0)
+    with pytest.raises(ValueError):
+        trainer.save(str(tmp_path))
+
+
+###############################################################################
+# test the compiled forward and the pickle and deepcopy round trips
+###############################################################################
+
+
+def test_compile_and_pickle():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    X_text = torch.randint(1, 100, (5, 10))
+    X = {"deeptabular": X_tab, "deeptext": X_text}
+    model = WideDeep(
+        deeptabular=deepcopy(tabmlp), deeptext=deepcopy(deeptext), compile=True
+    )
+    model.eval()
+    with torch.no_grad():
+        out = model(X)
+        expected = model._forward_impl(WDInput(deeptabular=X_tab, deeptext=X_text))
+        assert torch.allclose(out, expected, atol=1e-6)
+        for model_copy in [pickle.loads(pickle.dumps(model)), deepcopy(model)]:
+            assert model_copy._compiled_forward is not None
+            assert torch.allclose(model_copy(X), out, atol=1e-6)
+
+
+def test_load_model_pickled_without_new_attributes():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    X_text = torch.randint(1, 100, (5, 10))
+    X = {"deeptabular": X_tab, "deeptext": X_text}
+    for head_hidden_dims in [None, [8, 4]]:
+        model = WideDeep(
+            deeptabular=deepcopy(tabmlp),
+            deeptext=deepcopy(deeptext),
+            head_hidden_dims=head_hidden_dims,
+            enforce_positive=True,
+        )
+        model.eval()
+        # state of a model saved before these attributes were introduced
+        state = model.__getstate__()
+        for attr in [
+            "_tail",
+            "_deep_components",
+            "_deep_total_dim",
+            "_deepside_slices",
+            "_fuse_pred_layers",
+            "_prefetch_stream",
+            "_compiled_forward",
+            "with_compile",
+        ]:
+            del state[attr]
+        loaded_model = WideDeep.__new__(WideDeep)
+        loaded_model.__setstate__(state)
+        with torch.no_grad():
+            assert torch.equal(loaded_model(X), model(X))
+
+
+###############################################################################
+# test the model accepts both dictionaries and WDInput
+###############################################################################
+
+
+def test_dict_and_wdinput():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    X_text = torch.randint(1, 100, (5, 10))
+    model = WideDeep(deeptabular=deepcopy(tabmlp), deeptext=deepcopy(deeptext))
+    model.eval()
+    with torch.no_grad():
+        out_dict = model({"deeptabular": X_tab, "deeptext": X_text})
+        out_wdinput = model(WDInput(deeptabular=X_tab, deeptext=X_text))
+    assert torch.equal(out_dict, out_wdinput)
+
+
+###############################################################################
+# test the image component is set to channels last only when requested
+###############################################################################
+
+
+def test_deepimage_channels_last():
+    X_img = torch.rand(2, 3, 16, 16)
+    image_component = Vision(channel_sizes=[8, 8], kernel_sizes=3, strides=1)
+    for _ in range(2):
+        model = WideDeep(deepimage=image_component, channels_last=True)
+    params_4d = [p for p in model.deepimage.parameters() if p.dim() == 4]
+    assert len(params_4d) > 0
+    assert all(p.is_contiguous(memory_format=torch.channels_last) for p in params_4d)
+    assert len(image_component._forward_pre_hooks) == 0
+    model.eval()
+    with torch.no_grad():
+        out = model({"deepimage": X_img})
+    assert out.size() == (2, 1)
+
+
+class FlattenImage(nn.Module):
+    def __init__(self):
+        super(FlattenImage, self).__init__()
+        self.conv = nn.Conv2d(3, 2, 3)
+        self.output_dim = 2 * 14 * 14
+
+    def forward(self, X):
+        # 'view' requires contiguous (i.e. not channels last) inputs
+        return self.conv(X).view(X.size(0), -1)
+
+
+def test_custom_deepimage_default_memory_format():
+    X_img = torch.rand(2, 3, 16, 16)
+    model = WideDeep(deepimage=FlattenImage())
+    assert model.deepimage[0].conv.weight.is_contiguous()
+    model.eval()
+    with torch.no_grad():
+        out = model({"deepimage": X_img})
+    assert out.size() == (2, 1)
+
+
+###############################################################################
+# test the inputs are copied to the model's device
+###############################################################################
+
+
+def test_prefetch():
+    X = {
+        "deeptabular": torch.randint(0, 4, (5, 3)).float(),
+        "deeptext": torch.randint(1, 100, (5, 10)),
+    }
+    model = WideDeep(deeptabular=deepcopy(tabmlp), deeptext=deepcopy(deeptext))
+    X_device = model.prefetch(X)
+    assert X_device.keys() == X.keys()
+    for k, v in X_device.items():
+        assert v.device == next(model.parameters()).device
+        assert torch.equal(v, X[k])
+
+
+###############################################################################
+# test dynamic quantization
+###############################################################################
+
+
+def test_quantize_for_inference():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    X_text = torch.randint(1, 100, (5, 10))
+    model = WideDeep(deeptabular=deepcopy(tabmlp), deeptext=deepcopy(deeptext))
+    model.eval()
+    model.quantize_for_inference()
+    with torch.no_grad():
+        out = model({"deeptabular": X_tab, "deeptext": X_text})
+    assert not any(isinstance(m, nn.Linear) for m in model.modules())
+    assert out.size() == (5, 1)
+
+
+###############################################################################
+# test mixed precision forward
+###############################################################################
+
+
+def test_forward_amp():
+    X_tab = torch.randint(0, 4, (5, 3)).float()
+    model = WideDeep(deeptabular=deepcopy(tabmlp))
+    model.eval()
+    with torch.no_grad():
+        out = model.forward_amp({"deeptabular": X_tab})
+    assert out.size() == (5, 1)
+
+
+###############################################################################
+# test the default DDP bucket size
+###############################################################################
+
+
+def test_default_bucket_cap_mb():
+    model = WideDeep(wide=wide, deeptabular=tabmlp, enforce_positive=True)
+    assert model._default_bucket_cap_mb() == 25
+
+    large_wide = Wide(2**23, 1)
+    model = WideDeep(wide=large_wide)
+    wide_size_mb = sum(p.numel() * 4 for p in large_wide.parameters()) / 2**20
+    assert wide_size_mb > 25
+    assert model._default_bucket_cap_mb() == wide_size_mb